@@ -18,6 +18,23 @@ struct CSVOrder {
     uint64_t trader_id;
 };
 
+// Fixed-width little-endian packet written by
+// `scripts/generate_real_data.py --format bin` (keep in sync with
+// BIN_ORDER_FIELDS there). Symbol names live in "<file>.symbols",
+// one per line; symbol_id is the line index.
+struct BinOrder {
+    int64_t timestamp;
+    uint32_t symbol_id;
+    uint8_t side;        // 0 = BUY, 1 = SELL
+    uint8_t order_type;  // 0 = LIMIT, 1 = MARKET
+    uint16_t pad;
+    int64_t price_cents;
+    int64_t quantity;
+    int64_t order_id;
+    int64_t trader_id;
+};
+static_assert(sizeof(BinOrder) == 48, "BinOrder must match the generator's packet layout");
+
 CSVOrder parse_csv_line(const std::string& line) {
     CSVOrder order;
     std::stringstream ss(line);
@@ -36,26 +53,43 @@ CSVOrder parse_csv_line(const std::string& line) {
 }
 
 int main(int argc, char** argv) {
-    if (argc < 2) {
-        std::cerr << "Usage: " << argv[0] << " <csv_file>\n";
+    std::string input_file;
+    bool binary = false;
+    
+    for (int i = 1; i < argc; ++i) {
+        std::string arg = argv[i];
+        if (arg == "--format" && i + 1 < argc) {
+            std::string format = argv[++i];
+            if (format != "csv" && format != "bin") {
+                std::cerr << "Error: unknown format " << format << " (expected csv or bin)\n";
+                return 1;
+            }
+            binary = format == "bin";
+        } else {
+            input_file = arg;
+        }
+    }
+    
+    if (input_file.empty()) {
+        std::cerr << "Usage: " << argv[0] << " [--format csv|bin] <file>\n";
         std::cerr << "\nCSV Format (no header):\n";
         std::cerr << "timestamp,symbol,side,order_type,price,quantity,order_id,trader_id\n";
         std::cerr << "\nExample:\n";
         std::cerr << "1638360000000,AAPL,BUY,LIMIT,150.25,100,1,1001\n";
         std::cerr << "1638360001000,AAPL,SELL,LIMIT,150.26,50,2,1002\n";
+        std::cerr << "\n--format bin reads 48-byte packets from scripts/generate_real_data.py --format bin\n";
         return 1;
     }
     
-    std::string csv_file = argv[1];
-    std::ifstream file(csv_file);
+    std::ifstream file(input_file, binary ? std::ios::in | std::ios::binary : std::ios::in);
     
     if (!file.is_open()) {
-        std::cerr << "Error: Cannot open file " << csv_file << "\n";
+        std::cerr << "Error: Cannot open file " << input_file << "\n";
         return 1;
     }
     
     std::cout << "=== Real Market Data Replay ===\n";
-    std::cout << "Loading orders from: " << csv_file << "\n\n";
+    std::cout << "Loading orders from: " << input_file << "\n\n";
     
     // Create matching engine
     lob::MatchingEngine engine(true);  // Deterministic mode
@@ -63,72 +97,130 @@ int main(int argc, char** argv) {
     // Track symbols we've seen
     std::set<std::string> registered_symbols;
     
-    std::string line;
-    int line_num = 0;
     int orders_processed = 0;
     int trades_executed = 0;
     
-    // Skip header if present
-    std::getline(file, line);
-    if (line.find("timestamp") == std::string::npos) {
-        // Not a header, process as data
-        file.seekg(0);
-    }
-    
-    while (std::getline(file, line)) {
-        line_num++;
+    auto submit = [&](const std::string& symbol, lob::Side side, lob::OrderType order_type,
+                      lob::Price price, uint64_t quantity, uint64_t order_id,
+                      uint64_t trader_id, uint64_t timestamp) {
+        // Register symbol if not seen before
+        if (registered_symbols.find(symbol) == registered_symbols.end()) {
+            lob::SymbolConfig config{symbol, 1, 1, 1};
+            engine.add_symbol(config);
+            registered_symbols.insert(symbol);
+            std::cout << "Registered symbol: " << symbol << "\n";
+        }
+        
+        // Convert to engine request
+        lob::NewOrderRequest request{
+            .order_id = order_id,
+            .trader_id = trader_id,
+            .symbol = symbol,
+            .side = side,
+            .order_type = order_type,
+            .price = price,
+            .quantity = quantity,
+            .time_in_force = lob::TimeInForce::DAY,
+            .timestamp = timestamp
+        };
         
-        if (line.empty()) continue;
+        // Process order
+        auto response = engine.handle(request);
+        orders_processed++;
         
-        try {
-            CSVOrder csv_order = parse_csv_line(line);
+        if (response.result == lob::ResultCode::SUCCESS) {
+            trades_executed += response.trades.size();
             
-            // Register symbol if not seen before
-            if (registered_symbols.find(csv_order.symbol) == registered_symbols.end()) {
-                lob::SymbolConfig config{csv_order.symbol, 1, 1, 1};
-                engine.add_symbol(config);
-                registered_symbols.insert(csv_order.symbol);
-                std::cout << "Registered symbol: " << csv_order.symbol << "\n";
+            // Print trades
+            for (const auto& trade : response.trades) {
+                std::cout << "TRADE [" << symbol << "] "
+                          << trade.quantity << " @ $" 
+                          << trade.price / 100.0 << "\n";
+            }
+        }
+        
+        // Print progress every 1000 orders
+        if (orders_processed % 1000 == 0) {
+            std::cout << "Progress: " << orders_processed << " orders processed, "
+                      << trades_executed << " trades\n";
+        }
+    };
+    
+    if (binary) {
+        std::ifstream symbol_file(input_file + ".symbols");
+        if (!symbol_file.is_open()) {
+            std::cerr << "Error: Cannot open symbol table " << input_file << ".symbols\n";
+            return 1;
+        }
+        std::vector<std::string> symbols;
+        for (std::string name; std::getline(symbol_file, name);) {
+            symbols.push_back(name);
+        }
+        
+        // Read packets in blocks straight into the struct array
+        std::vector<BinOrder> block(4096);
+        size_t record_num = 0;
+        while (file.read(reinterpret_cast<char*>(block.data()),
+                         static_cast<std::streamsize>(block.size() * sizeof(BinOrder))) ||
+               file.gcount() > 0) {
+            size_t count = static_cast<size_t>(file.gcount()) / sizeof(BinOrder);
+            if (static_cast<size_t>(file.gcount()) % sizeof(BinOrder) != 0) {
+                std::cerr << "Warning: ignoring truncated trailing record\n";
             }
             
-            // Convert to engine request
-            lob::NewOrderRequest request{
-                .order_id = csv_order.order_id,
-                .trader_id = csv_order.trader_id,
-                .symbol = csv_order.symbol,
-                .side = csv_order.side == "BUY" ? lob::Side::BUY : lob::Side::SELL,
-                .order_type = csv_order.order_type == "MARKET" ? 
-                              lob::OrderType::MARKET : lob::OrderType::LIMIT,
-                .price = static_cast<lob::Price>(csv_order.price * 100), // Convert to cents
-                .quantity = csv_order.quantity,
-                .time_in_force = lob::TimeInForce::DAY,
-                .timestamp = csv_order.timestamp
-            };
-            
-            // Process order
-            auto response = engine.handle(request);
-            orders_processed++;
-            
-            if (response.result == lob::ResultCode::SUCCESS) {
-                trades_executed += response.trades.size();
+            for (size_t i = 0; i < count; ++i, ++record_num) {
+                const BinOrder& rec = block[i];
+                if (rec.symbol_id >= symbols.size()) {
+                    std::cerr << "Error in record " << record_num << ": unknown symbol id "
+                              << rec.symbol_id << "\n";
+                    continue;
+                }
                 
-                // Print trades
-                for (const auto& trade : response.trades) {
-                    std::cout << "TRADE [" << csv_order.symbol << "] "
-                              << trade.quantity << " @ $" 
-                              << trade.price / 100.0 << "\n";
+                try {
+                    submit(symbols[rec.symbol_id],
+                           rec.side == 0 ? lob::Side::BUY : lob::Side::SELL,
+                           rec.order_type == 1 ? lob::OrderType::MARKET : lob::OrderType::LIMIT,
+                           rec.price_cents,
+                           static_cast<uint64_t>(rec.quantity),
+                           static_cast<uint64_t>(rec.order_id),
+                           static_cast<uint64_t>(rec.trader_id),
+                           static_cast<uint64_t>(rec.timestamp));
+                } catch (const std::exception& e) {
+                    std::cerr << "Error in record " << record_num << ": " << e.what() << "\n";
                 }
             }
+        }
+    } else {
+        std::string line;
+        int line_num = 0;
+        
+        // Skip header if present
+        std::getline(file, line);
+        if (line.find("timestamp") == std::string::npos) {
+            // Not a header, process as data
+            file.seekg(0);
+        }
+        
+        while (std::getline(file, line)) {
+            line_num++;
             
-            // Print progress every 1000 orders
-            if (orders_processed % 1000 == 0) {
-                std::cout << "Progress: " << orders_processed << " orders processed, "
-                          << trades_executed << " trades\n";
-            }
+            if (line.empty()) continue;
             
-        } catch (const std::exception& e) {
-            std::cerr << "Error parsing line " << line_num << ": " << e.what() << "\n";
-            continue;
+            try {
+                CSVOrder csv_order = parse_csv_line(line);
+                submit(csv_order.symbol,
+                       csv_order.side == "BUY" ? lob::Side::BUY : lob::Side::SELL,
+                       csv_order.order_type == "MARKET" ? 
+                           lob::OrderType::MARKET : lob::OrderType::LIMIT,
+                       static_cast<lob::Price>(csv_order.price * 100), // Convert to cents
+                       csv_order.quantity,
+                       csv_order.order_id,
+                       csv_order.trader_id,
+                       csv_order.timestamp);
+            } catch (const std::exception& e) {
+                std::cerr << "Error parsing line " << line_num << ": " << e.what() << "\n";
+                continue;
+            }
         }
     }
     
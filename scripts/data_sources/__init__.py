@@ -0,0 +1 @@
+"""Market data sources shared by the fetch/generate scripts"""
@@ -0,0 +1,92 @@
+"""
+Yahoo Finance intraday bars converted to synthetic LIMIT orders
+Used by scripts/generate_real_data.py and fetch_yahoo_simple.py
+"""
+
+import csv
+import importlib.util
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import yfinance as yf
+
+# Rows are handed to csv.writer in batches through a large file buffer
+WRITE_CHUNK_ROWS = 10_000
+WRITE_BUFFER_SIZE = 1 << 20
+
+# Responses are cached on disk per (symbol, period, interval, day), in a
+# per-user directory rather than wherever the script happens to run
+CACHE_DIR = Path(os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache') / 'yfcache'
+CACHE_MAX_AGE = 3600  # seconds; intraday bars keep arriving during the day
+
+def _have_parquet_engine():
+    return any(importlib.util.find_spec(m) for m in ('pyarrow', 'fastparquet'))
+
+def history(symbol, period="1d", interval="1m", *, use_parquet=None, cache_dir=CACHE_DIR):
+    """ticker.history() with an on-disk cache
+    
+    The cache is parquet when a parquet engine is installed (use_parquet=None)
+    and falls back to pickle otherwise.
+    """
+    if use_parquet is None:
+        use_parquet = _have_parquet_engine()
+    today = datetime.now().strftime('%Y-%m-%d')
+    suffix = 'parquet' if use_parquet else 'pkl'
+    path = Path(cache_dir) / f"{symbol}_{period}_{interval}_{today}.{suffix}"
+    if path.exists() and time.time() - path.stat().st_mtime < CACHE_MAX_AGE:
+        print(f"   (cached: {path})")
+        return pd.read_parquet(path) if use_parquet else pd.read_pickle(path)
+    
+    hist = yf.Ticker(symbol).history(period=period, interval=interval)
+    if not hist.empty:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if use_parquet:
+            hist.to_parquet(path)
+        else:
+            hist.to_pickle(path)
+    return hist
+
+def fetch(symbol, output_file, *, period="1d", interval="1m",
+          use_parquet=None, cache_dir=CACHE_DIR):
+    """Write one BUY at the low and one SELL at the high per bar to output_file
+    
+    Returns the bar DataFrame; nothing is written if it is empty.
+    """
+    hist = history(symbol, period, interval, use_parquet=use_parquet, cache_dir=cache_dir)
+    if hist.empty:
+        return hist
+    
+    # Epoch ms whatever unit the index is stored in (seconds on pandas 3.x)
+    ts = hist.index.values.astype('datetime64[ms]').astype(np.int64)
+    low = hist['Low'].to_numpy()
+    high = hist['High'].to_numpy()
+    volume = (hist['Volume'].to_numpy() // 100).astype(np.int64)
+    
+    # BUY/SELL rows interleaved per bar
+    n = len(hist)
+    rows = np.empty((2 * n, 8), dtype=object)
+    rows[0::2, 0] = ts
+    rows[1::2, 0] = ts
+    rows[:, 1] = symbol
+    rows[0::2, 2] = 'BUY'
+    rows[1::2, 2] = 'SELL'
+    rows[:, 3] = 'LIMIT'
+    rows[0::2, 4] = low
+    rows[1::2, 4] = high
+    rows[0::2, 5] = volume
+    rows[1::2, 5] = volume
+    rows[:, 6] = np.arange(1, 2 * n + 1)
+    rows[0::2, 7] = 1000
+    rows[1::2, 7] = 1001
+    
+    with open(output_file, 'w', newline='', buffering=WRITE_BUFFER_SIZE) as f:
+        writer = csv.writer(f)
+        writer.writerow(['timestamp', 'symbol', 'side', 'order_type', 'price', 'quantity', 'order_id', 'trader_id'])
+        for start in range(0, 2 * n, WRITE_CHUNK_ROWS):
+            writer.writerows(rows[start:start + WRITE_CHUNK_ROWS].tolist())
+    
+    return hist
@@ -5,69 +5,302 @@ Can also fetch real historical data from various sources
 """
 
 import argparse
-import random
 import csv
+import os
+import queue
+import sys
+import threading
 from datetime import datetime, timedelta
+from pathlib import Path
 
-def generate_realistic_orders(symbol, num_orders, output_file):
-    """Generate realistic order flow"""
+# Rows are handed to csv.writer in batches through a large file buffer
+WRITE_CHUNK_ROWS = 10_000
+WRITE_BUFFER_SIZE = 1 << 20
+
+# Fixed-schema rows for the generator, formatted straight to bytes
+CSV_HEADER = b"timestamp,symbol,side,order_type,price,quantity,order_id,trader_id\n"
+LIMIT_ROW = b"%d,%s,%s,LIMIT,%d.%02d,%d,%d,%d\n"  # price as dollars.cents
+MARKET_ROW = b"%d,%s,%s,MARKET,0.0,%d,%d,%d\n"
+
+# Code -> value tables for dictionary-encoded columns
+SIDES = ('BUY', 'SELL')
+ORDER_TYPES = ('LIMIT', 'MARKET')
+
+# Fixed-width 48-byte little-endian order packet for `--format bin`.
+# Must match BinOrder in examples/csv_replay.cpp; symbol names are
+# stored one per line in a "<file>.symbols" sidecar (id = line index)
+BIN_ORDER_FIELDS = [
+    ('timestamp', '<i8'), ('symbol_id', '<u4'), ('side', 'u1'), ('order_type', 'u1'),
+    ('_pad', '<u2'), ('price_cents', '<i8'), ('quantity', '<i8'), ('order_id', '<i8'),
+    ('trader_id', '<i8'),
+]
+
+# io_uring path: coalesce chunks into 4 MiB buffers, 8 writes per submit
+URING_BUFFER_SIZE = 4 << 20
+URING_QUEUE_DEPTH = 8
+
+# Formatted chunks waiting for the background writer thread
+WRITER_QUEUE_DEPTH = 4
+
+def _write_all(fd, data):
+    """os.write until every byte of data has been written"""
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view):]
+
+def _uring_api(uring):
+    """(Ring, Cqe, new_api) for the installed liburing, or None if unsupported
+    
+    liburing 2026.x names the ring/CQE types Ring/Cqe and takes Python
+    buffers directly; 2024.x names them io_uring/io_uring_cqe and needs
+    an iovec for the raw pointer.
+    """
+    if all(hasattr(uring, name) for name in ('Ring', 'Cqe', 'io_uring_prep_write')):
+        return uring.Ring, uring.Cqe, True
+    if all(hasattr(uring, name) for name in ('io_uring', 'io_uring_cqe', 'iovec')):
+        return uring.io_uring, uring.io_uring_cqe, False
+    return None
+
+def _uring_write_batch(uring, new_api, ring, cqe, fd, batch):
+    """Submit one write per (offset, buffer) in batch and reap every completion"""
+    if new_api:
+        for offset, buf in batch:
+            uring.io_uring_prep_write(uring.io_uring_get_sqe(ring), fd, buf, offset)
+    else:
+        iovs = [uring.iovec(buf) for _, buf in batch]
+        for (offset, _), iov in zip(batch, iovs):
+            sqe = uring.io_uring_get_sqe(ring)
+            uring.io_uring_prep_write(sqe, fd, iov[0].iov_base, iov[0].iov_len, offset)
+    uring.io_uring_submit(ring)
+    
+    written = 0
+    for _ in batch:
+        uring.io_uring_wait_cqe(ring, cqe)
+        entry = cqe[0] if new_api else cqe
+        written += uring.trap_error(entry.res)
+        uring.io_uring_cqe_seen(ring, entry)
+    if written != sum(len(buf) for _, buf in batch):
+        raise OSError("short io_uring write")
+
+def _write_chunks(fd, chunks):
+    """Write an iterable of bytes chunks to fd
+    
+    Uses io_uring (via the liburing package, 2024.x or 2026.x API) when it
+    is installed and the kernel supports it, otherwise plain os.write.
+    """
+    try:
+        import liburing as uring
+        api = _uring_api(uring)
+        if api is None:
+            raise ImportError("unsupported liburing API")
+        ring_type, cqe_type, new_api = api
+        ring = ring_type()
+        cqe = cqe_type()
+        uring.trap_error(uring.io_uring_queue_init(URING_QUEUE_DEPTH, ring, 0))
+    except (ImportError, OSError):
+        for chunk in chunks:
+            _write_all(fd, chunk)
+        return
+    
+    try:
+        offset = 0
+        batch = []
+        buf = bytearray()
+        for chunk in chunks:
+            buf += chunk
+            if len(buf) >= URING_BUFFER_SIZE:
+                batch.append((offset, buf))
+                offset += len(buf)
+                buf = bytearray()
+                if len(batch) == URING_QUEUE_DEPTH:
+                    _uring_write_batch(uring, new_api, ring, cqe, fd, batch)
+                    batch = []
+        if buf:
+            batch.append((offset, buf))
+        if batch:
+            _uring_write_batch(uring, new_api, ring, cqe, fd, batch)
+    finally:
+        uring.io_uring_queue_exit(ring)
+
+def _write_chunks_async(fd, chunks):
+    """_write_chunks on a background thread
+    
+    The caller keeps producing (formatting) the next chunk while the
+    writer thread is blocked in write(), which releases the GIL.
+    """
+    pending = queue.Queue(maxsize=WRITER_QUEUE_DEPTH)
+    errors = []
+    done = threading.Event()  # sentinel already taken off the queue
+    
+    def received():
+        while True:
+            chunk = pending.get()
+            if chunk is None:
+                done.set()
+                return
+            yield chunk
+    
+    def writer():
+        try:
+            _write_chunks(fd, received())
+        except Exception as e:
+            errors.append(e)
+            # Unblock the producer, unless the failure came after the sentinel
+            # (e.g. the final io_uring flush) and nothing more will arrive
+            while not done.is_set() and pending.get() is not None:
+                pass
+    
+    thread = threading.Thread(target=writer, daemon=True)
+    thread.start()
+    try:
+        for chunk in chunks:
+            if errors:
+                break
+            pending.put(chunk)
+    finally:
+        pending.put(None)
+        thread.join()
+    if errors:
+        raise errors[0]
+
+def _write_parquet(path, columns, dictionaries=None):
+    """Write columns (name -> array) as a zstd-compressed Parquet file
+    
+    Columns named in dictionaries hold integer codes into the given values
+    and are stored as dictionary arrays rather than repeated strings.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        print("❌ pyarrow not found. Install: pip install pyarrow")
+        return False
+    
+    dictionaries = dictionaries or {}
+    table = pa.table({
+        name: pa.DictionaryArray.from_arrays(pa.array(values), pa.array(list(dictionaries[name])))
+        if name in dictionaries else values
+        for name, values in columns.items()
+    })
+    pq.write_table(table, path, compression='zstd')
+    return True
+
+def _write_bin(path, symbols, columns):
+    """Write columns as BIN_ORDER_FIELDS packets plus the symbol sidecar"""
+    import numpy as np
+    
+    records = np.zeros(len(columns['timestamp']), dtype=np.dtype(BIN_ORDER_FIELDS))
+    for name, values in columns.items():
+        records[name] = values
+    records.tofile(path)
+    Path(f"{path}.symbols").write_text(''.join(f"{s}\n" for s in symbols))
+
+def generate_realistic_orders(symbol, num_orders, output_file, parquet=False, fmt='csv', seed=None):
+    """Generate realistic order flow
+    
+    Returns False (nothing written) if numpy is not installed.
+    """
+    try:
+        import numpy as np
+    except ImportError:
+        print("❌ numpy not found. Install: pip install numpy")
+        return False
+    
     print(f"Generating {num_orders} realistic orders for {symbol}...")
     
-    with open(output_file, 'w', newline='') as f:
-        writer = csv.writer(f)
-        # Write header
-        writer.writerow(['timestamp', 'symbol', 'side', 'order_type', 'price', 'quantity', 'order_id', 'trader_id'])
-        
-        # Starting conditions
-        mid_price = 150.00
-        timestamp = int(datetime.now().timestamp() * 1000)
-        
-        for i in range(num_orders):
-            # Random walk for mid price
-            mid_price += random.uniform(-0.10, 0.10)
-            mid_price = max(100.0, min(200.0, mid_price))  # Keep in range
-            
-            # 80% limit orders, 20% market orders
-            order_type = 'LIMIT' if random.random() < 0.8 else 'MARKET'
-            
-            # 50-50 buy/sell
-            side = 'BUY' if random.random() < 0.5 else 'SELL'
-            
-            # Price around mid with spread
-            if order_type == 'LIMIT':
-                spread = random.uniform(0.01, 0.10)
-                if side == 'BUY':
-                    price = round(mid_price - spread, 2)
-                else:
-                    price = round(mid_price + spread, 2)
-            else:
-                price = 0.0  # Market order
-            
-            # Realistic quantities (round lots)
-            quantity = random.choice([100, 200, 500, 1000, 2000, 5000])
-            
-            # Unique IDs
-            order_id = i + 1
-            trader_id = random.randint(1000, 1100)
-            
-            # Timestamp increments (1-100ms between orders)
-            timestamp += random.randint(1, 100)
-            
-            writer.writerow([
-                timestamp,
-                symbol,
-                side,
-                order_type,
-                price,
-                quantity,
-                order_id,
-                trader_id
-            ])
+    rng = np.random.default_rng(seed)
+    n = num_orders
+    
+    # Random walk for mid price, kept in range
+    steps = rng.uniform(-0.10, 0.10, n)
+    mid = np.clip(150.0 + np.cumsum(steps), 100.0, 200.0)
+    
+    # 80% limit orders, 20% market orders; 50-50 buy/sell
+    is_limit = rng.random(n) < 0.8
+    side_buy = rng.random(n) < 0.5
+    
+    # Price in integer cents: mid +/- a 1-10 cent spread (0 for market orders)
+    mid_cents = np.rint(mid * 100).astype(np.int64)
+    spread_cents = rng.integers(1, 11, n)
+    price_cents = np.where(is_limit, np.where(side_buy, mid_cents - spread_cents,
+                                              mid_cents + spread_cents), 0)
+    dollars, cents = np.divmod(price_cents, 100)
+    
+    # Realistic quantities (round lots)
+    quantity = rng.choice(np.array([100, 200, 500, 1000, 2000, 5000]), n)
+    
+    # Timestamp increments (1-100ms between orders)
+    ts0 = int(datetime.now().timestamp() * 1000)
+    timestamp = ts0 + np.cumsum(rng.integers(1, 101, n))
+    
+    order_id = np.arange(1, n + 1)
+    trader_id = rng.integers(1000, 1101, n, dtype=np.uint16)
+    
+    # Small integer codes for the categorical columns
+    side_code = (~side_buy).astype(np.uint8)
+    order_type_code = (~is_limit).astype(np.uint8)
+    side = np.array([s.encode() for s in SIDES])[side_code]
+    sym = symbol.encode()
+    
+    def chunks():
+        yield CSV_HEADER
+        for start in range(0, n, WRITE_CHUNK_ROWS):
+            stop = start + WRITE_CHUNK_ROWS
+            yield b"".join(
+                LIMIT_ROW % (ts, sym, sd, dol, cts, qty, oid, tid) if limit
+                else MARKET_ROW % (ts, sym, sd, qty, oid, tid)
+                for ts, limit, sd, dol, cts, qty, oid, tid in zip(
+                    timestamp[start:stop].tolist(),
+                    is_limit[start:stop].tolist(),
+                    side[start:stop].tolist(),
+                    dollars[start:stop].tolist(),
+                    cents[start:stop].tolist(),
+                    quantity[start:stop].tolist(),
+                    order_id[start:stop].tolist(),
+                    trader_id[start:stop].tolist()))
+    
+    if fmt == 'bin':
+        _write_bin(output_file, [symbol], {
+            'timestamp': timestamp,
+            'symbol_id': 0,
+            'side': side_code,
+            'order_type': order_type_code,
+            'price_cents': price_cents,
+            'quantity': quantity,
+            'order_id': order_id,
+            'trader_id': trader_id})
+    else:
+        fd = os.open(output_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            _write_chunks_async(fd, chunks())
+        finally:
+            os.close(fd)
     
     print(f"✅ Generated {output_file}")
     print(f"   Symbol: {symbol}")
     print(f"   Orders: {num_orders}")
-    print(f"   Format: CSV with header")
+    if fmt == 'bin':
+        print(f"   Format: binary packets (symbols in {output_file}.symbols)")
+    else:
+        print(f"   Format: CSV with header")
+    
+    if parquet:
+        parquet_file = str(Path(output_file).with_suffix('.parquet'))
+        if _write_parquet(parquet_file, {
+                'timestamp': timestamp,
+                'symbol': np.zeros(n, np.uint16),
+                'side': side_code,
+                'order_type': order_type_code,
+                'price': price_cents / 100,
+                'quantity': quantity,
+                'order_id': order_id,
+                'trader_id': trader_id}, dictionaries={
+                'symbol': [symbol],
+                'side': SIDES,
+                'order_type': ORDER_TYPES}):
+            print(f"✅ Generated {parquet_file} (Parquet, zstd)")
+    
+    return True
 
 def fetch_polygon_data(symbol, date, api_key, output_file):
     """Fetch real tick data from Polygon.io"""
@@ -88,20 +321,27 @@ def fetch_polygon_data(symbol, date, api_key, output_file):
         
         print(f"✅ Fetched {len(data['results'])} data points")
         
-        with open(output_file, 'w', newline='') as f:
+        with open(output_file, 'w', newline='', buffering=WRITE_BUFFER_SIZE) as f:
             writer = csv.writer(f)
             writer.writerow(['timestamp', 'symbol', 'side', 'order_type', 'price', 'quantity', 'order_id', 'trader_id'])
             
+            rows = []
             order_id = 1
             for bar in data['results']:
                 # Convert OHLCV to synthetic orders
                 timestamp = bar['t']
                 
                 # Create bid at low, ask at high
-                writer.writerow([timestamp, symbol, 'BUY', 'LIMIT', bar['l'], bar['v']//4, order_id, 1000])
+                rows.append((timestamp, symbol, 'BUY', 'LIMIT', bar['l'], bar['v']//4, order_id, 1000))
                 order_id += 1
-                writer.writerow([timestamp, symbol, 'SELL', 'LIMIT', bar['h'], bar['v']//4, order_id, 1001])
+                rows.append((timestamp, symbol, 'SELL', 'LIMIT', bar['h'], bar['v']//4, order_id, 1001))
                 order_id += 1
+                
+                if len(rows) >= WRITE_CHUNK_ROWS:
+                    writer.writerows(rows)
+                    rows.clear()
+            
+            writer.writerows(rows)
         
         print(f"✅ Saved to {output_file}")
         
@@ -113,37 +353,25 @@ def fetch_polygon_data(symbol, date, api_key, output_file):
 def fetch_yahoo_data(symbol, output_file):
     """Fetch real historical data from Yahoo Finance"""
     try:
-        import yfinance as yf
+        from data_sources import yahoo
         
         print(f"Fetching real data from Yahoo Finance for {symbol}...")
         
-        ticker = yf.Ticker(symbol)
-        hist = ticker.history(period="1d", interval="1m")
+        hist = yahoo.fetch(symbol, output_file)
         
         if hist.empty:
             print("❌ No data found")
             return
         
         print(f"✅ Fetched {len(hist)} data points")
-        
-        with open(output_file, 'w', newline='') as f:
-            writer = csv.writer(f)
-            writer.writerow(['timestamp', 'symbol', 'side', 'order_type', 'price', 'quantity', 'order_id', 'trader_id'])
-            
-            order_id = 1
-            for timestamp, row in hist.iterrows():
-                ts = int(timestamp.timestamp() * 1000)
-                
-                # Create orders from OHLC
-                writer.writerow([ts, symbol, 'BUY', 'LIMIT', row['Low'], int(row['Volume']//100), order_id, 1000])
-                order_id += 1
-                writer.writerow([ts, symbol, 'SELL', 'LIMIT', row['High'], int(row['Volume']//100), order_id, 1001])
-                order_id += 1
-        
         print(f"✅ Saved to {output_file}")
         
-    except ImportError:
-        print("❌ yfinance library not found. Install: pip install yfinance")
+    except ImportError as e:
+        # data_sources.yahoo also needs numpy and pandas; name the one missing
+        if e.name:
+            print(f"❌ {e.name} library not found. Install: pip install {e.name}")
+        else:
+            print(f"❌ {e}")
     except Exception as e:
         print(f"❌ Error: {e}")
 
@@ -156,11 +384,19 @@ def main():
     parser.add_argument('--output', default='market_data.csv', help='Output CSV file')
     parser.add_argument('--api-key', help='Polygon.io API key (polygon mode)')
     parser.add_argument('--date', help='Date for Polygon data (YYYY-MM-DD)')
+    parser.add_argument('--format', choices=['csv', 'bin'], default='csv',
+                       help='Output format for generate mode (bin = fixed-width packets for csv_replay --format bin)')
+    parser.add_argument('--seed', type=int, default=None,
+                       help='RNG seed for reproducible order flow (generate mode)')
+    parser.add_argument('--parquet', action='store_true',
+                       help='Also write a zstd Parquet copy next to the CSV (generate mode, needs pyarrow)')
     
     args = parser.parse_args()
     
     if args.mode == 'generate':
-        generate_realistic_orders(args.symbol, args.orders, args.output)
+        if not generate_realistic_orders(args.symbol, args.orders, args.output, args.parquet,
+                                         args.format, args.seed):
+            sys.exit(1)
     elif args.mode == 'polygon':
         if not args.api_key:
             print("❌ --api-key required for Polygon mode")
@@ -170,8 +406,9 @@ def main():
     elif args.mode == 'yahoo':
         fetch_yahoo_data(args.symbol, args.output)
     
+    replay_format = '--format bin ' if args.mode == 'generate' and args.format == 'bin' else ''
     print(f"\n📊 Ready to replay:")
-    print(f"   ./build/csv_replay {args.output}")
+    print(f"   ./build/csv_replay {replay_format}{args.output}")
 
 if __name__ == '__main__':
     main()
@@ -4,53 +4,219 @@ Generate sample market data CSV files for testing the LOB engine
 """
 
 import argparse
+import os
 import random
 import csv
-from datetime import datetime, timedelta
+import heapq
+from contextlib import ExitStack
+from datetime import datetime
 
-def generate_realistic_orders(symbols, num_orders, output_file):
-    """Generate realistic order flow CSV"""
+# Optional: numba (and numpy) to compile the state machine
+try:
+    import numpy as np
+    from numba import njit
+except ImportError:
+    njit = None
+
+# Action/side/order-type codes used by the compiled simulator
+ACTIONS = ("NEW", "CANCEL", "REPLACE")
+SIDES = ("BUY", "SELL")
+ORDER_TYPES = ("LIMIT", "MARKET")
+NEW, CANCEL, REPLACE = range(3)
+
+# ".000" .. ".999" millisecond suffixes
+_MILLIS = [f".{ms:03d}" for ms in range(1000)]
+
+CSV_HEADER = ['timestamp', 'action', 'order_id', 'symbol',
+              'side', 'price', 'quantity', 'order_type']
+
+def _timestamp_formatter():
+    """Return fmt(ts_ms) -> 'YYYY-mm-ddTHH:MM:SS.mmm' (local time)
+    
+    Keeps the rendered string of the current whole second and its epoch
+    millis; rows inside that second are one subtraction and a suffix
+    lookup. datetime/strftime only runs when the second moves.
+    """
+    base_ms = None
+    base_str = ""
+    
+    def fmt(ts_ms):
+        nonlocal base_ms, base_str
+        dms = ts_ms - base_ms if base_ms is not None else -1
+        if not 0 <= dms < 1000:
+            base_ms = ts_ms - ts_ms % 1000
+            base_str = datetime.fromtimestamp(base_ms // 1000).strftime("%Y-%m-%dT%H:%M:%S")
+            dms = ts_ms - base_ms
+        return base_str + _MILLIS[dms]
+    
+    return fmt
+
+if njit is not None:
+    @njit('Tuple((int64[::1], int8[::1], int64[::1], int64[::1], int8[::1], '
+          'int64[::1], int64[::1], int8[::1], int64))(int64, int64, int64, int64)',
+          cache=True)
+    def _simulate(num_orders, num_symbols, first_order_id, seed):
+        """Run the order-flow state machine, returning one array per column"""
+        np.random.seed(seed)
+        
+        # Starting mid prices for each symbol
+        mid_prices = np.empty(num_symbols)
+        for s in range(num_symbols):
+            mid_prices[s] = np.random.uniform(100, 500)
+        
+        offset_ms = np.empty(num_orders, np.int64)
+        action = np.empty(num_orders, np.int8)
+        order_ids = np.empty(num_orders, np.int64)
+        symbol = np.empty(num_orders, np.int64)
+        side = np.zeros(num_orders, np.int8)
+        price_cents = np.zeros(num_orders, np.int64)
+        quantity = np.zeros(num_orders, np.int64)
+        order_type = np.zeros(num_orders, np.int8)
+        
+        # Live order ids; cancels swap the victim with the last slot and pop
+        active = np.empty(num_orders, np.int64)
+        n_active = 0
+        order_id = first_order_id
+        elapsed = 0
+        
+        for i in range(num_orders):
+            sym = np.random.randint(0, num_symbols)
+            mid = mid_prices[sym]
+            offset_ms[i] = elapsed
+            symbol[i] = sym
+            
+            # 60% new orders, 30% cancels, 10% replaces
+            action_roll = np.random.random()
+            
+            if action_roll < 0.6 or n_active < 10:
+                sd = np.random.randint(0, 2)
+                if sd == 0:
+                    px = mid - np.random.uniform(0.01, 2.0)
+                else:
+                    px = mid + np.random.uniform(0.01, 2.0)
+                
+                action[i] = NEW
+                order_ids[i] = order_id
+                side[i] = sd
+                price_cents[i] = int(px * 100.0 + 0.5)
+                quantity[i] = np.random.randint(10, 1001)
+                order_type[i] = 0 if np.random.random() < 0.8 else 1  # 80% LIMIT
+                
+                active[n_active] = order_id
+                n_active += 1
+                order_id += 1
+                
+            elif action_roll < 0.9:
+                idx = np.random.randint(0, n_active)
+                action[i] = CANCEL
+                order_ids[i] = active[idx]
+                active[idx] = active[n_active - 1]
+                n_active -= 1
+                
+            else:
+                idx = np.random.randint(0, n_active)
+                sd = np.random.randint(0, 2)
+                if sd == 0:
+                    px = mid - np.random.uniform(0.01, 2.0)
+                else:
+                    px = mid + np.random.uniform(0.01, 2.0)
+                
+                action[i] = REPLACE
+                order_ids[i] = active[idx]
+                side[i] = sd
+                price_cents[i] = int(px * 100.0 + 0.5)
+                quantity[i] = np.random.randint(10, 1001)
+            
+            # Drift mid price slightly
+            if i % 100 == 0:
+                mid_prices[sym] += np.random.uniform(-0.5, 0.5)
+            
+            # Advance time by 1-10 milliseconds
+            elapsed += np.random.randint(1, 11)
+        
+        return (offset_ms, action, order_ids, symbol, side, price_cents,
+                quantity, order_type, n_active)
+
+
+def _realistic_orders_jit(symbols, num_orders, start_ms, first_order_id, seed):
+    """Order rows from the compiled simulator"""
+    fmt = _timestamp_formatter()
+    if seed is None:
+        seed = random.randrange(2**31)
+    (offset_ms, action, order_ids, symbol, side, price_cents,
+     quantity, order_type, n_active) = _simulate(
+        num_orders, len(symbols), first_order_id, seed)
+    
+    orders = [None] * num_orders
+    for i, (off, act, oid, sym, sd, cents, qty, otype) in enumerate(zip(
+            offset_ms.tolist(), action.tolist(), order_ids.tolist(),
+            symbol.tolist(), side.tolist(), price_cents.tolist(),
+            quantity.tolist(), order_type.tolist())):
+        ts = fmt(start_ms + off)
+        if act == CANCEL:
+            orders[i] = (ts, ACTIONS[act], oid, symbols[sym], "", "", "", "")
+        else:
+            orders[i] = (ts, ACTIONS[act], oid, symbols[sym], SIDES[sd],
+                         cents / 100, qty, ORDER_TYPES[otype])
+    
+    return orders, n_active
+
+
+def _realistic_orders_py(symbols, num_orders, start_ms, first_order_id, seed):
+    """Order rows from the pure-Python simulator (no numba available)"""
+    
+    # Bind RNG methods to locals once rather than per row
+    rng = random.Random(seed)
+    _rand = rng.random
+    _uniform = rng.uniform
+    _choice = rng.choice
+    _randint = rng.randint
+    _randrange = rng.randrange
+    fmt = _timestamp_formatter()
     
     # Starting mid prices for each symbol
-    mid_prices = {symbol: random.uniform(100, 500) for symbol in symbols}
+    mid_prices = {symbol: _uniform(100, 500) for symbol in symbols}
     
-    orders = []
-    current_time = datetime.now()
-    order_id = 1
+    # Presample the symbol for every row in one batched call
+    row_symbols = rng.choices(symbols, k=num_orders)
+    
+    # One fixed-shape row tuple per iteration, assigned into a preallocated list
+    orders = [None] * num_orders
+    out_idx = 0
+    ts_ms = start_ms
+    order_id = first_order_id
     active_orders = []
     
-    for i in range(num_orders):
-        symbol = random.choice(symbols)
+    for i, symbol in enumerate(row_symbols):
         mid = mid_prices[symbol]
         
         # 60% new orders, 30% cancels, 10% replaces
-        action_roll = random.random()
+        action_roll = _rand()
         
         if action_roll < 0.6 or len(active_orders) < 10:
             # New order
             action = "NEW"
-            side = random.choice(["BUY", "SELL"])
+            side = _choice(SIDES)
             
-            # Price relative to mid
+            # Price relative to mid, snapped to whole cents
             if side == "BUY":
-                price = mid - random.uniform(0.01, 2.0)
+                price_cents = int((mid - _uniform(0.01, 2.0)) * 100 + 0.5)
             else:
-                price = mid + random.uniform(0.01, 2.0)
-            
-            price = round(price, 2)
-            quantity = random.randint(10, 1000)
-            order_type = random.choice(["LIMIT"] * 8 + ["MARKET"] * 2)  # 80% LIMIT
+                price_cents = int((mid + _uniform(0.01, 2.0)) * 100 + 0.5)
+            quantity = _randint(10, 1000)
+            order_type = 'LIMIT' if _rand() < 0.8 else 'MARKET'  # 80% LIMIT
             
-            orders.append([
-                current_time.strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3],
+            orders[out_idx] = (
+                fmt(ts_ms),
                 action,
                 order_id,
                 symbol,
                 side,
-                price,
+                price_cents / 100,
                 quantity,
                 order_type
-            ])
+            )
+            out_idx += 1
             
             active_orders.append(order_id)
             order_id += 1
@@ -58,11 +224,13 @@ def generate_realistic_orders(symbols, num_orders, output_file):
         elif action_roll < 0.9 and active_orders:
             # Cancel
             action = "CANCEL"
-            cancel_id = random.choice(active_orders)
-            active_orders.remove(cancel_id)
+            idx = _randrange(len(active_orders))
+            cancel_id = active_orders[idx]
+            active_orders[idx] = active_orders[-1]
+            active_orders.pop()
             
-            orders.append([
-                current_time.strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3],
+            orders[out_idx] = (
+                fmt(ts_ms),
                 action,
                 cancel_id,
                 symbol,
@@ -70,123 +238,196 @@ def generate_realistic_orders(symbols, num_orders, output_file):
                 "",
                 "",
                 ""
-            ])
+            )
+            out_idx += 1
             
         elif active_orders:
             # Replace
             action = "REPLACE"
-            replace_id = random.choice(active_orders)
-            side = random.choice(["BUY", "SELL"])
+            replace_id = active_orders[_randrange(len(active_orders))]
+            side = _choice(SIDES)
             
             if side == "BUY":
-                price = mid - random.uniform(0.01, 2.0)
+                price_cents = int((mid - _uniform(0.01, 2.0)) * 100 + 0.5)
             else:
-                price = mid + random.uniform(0.01, 2.0)
-            
-            price = round(price, 2)
-            quantity = random.randint(10, 1000)
+                price_cents = int((mid + _uniform(0.01, 2.0)) * 100 + 0.5)
+            quantity = _randint(10, 1000)
             
-            orders.append([
-                current_time.strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3],
+            orders[out_idx] = (
+                fmt(ts_ms),
                 action,
                 replace_id,
                 symbol,
                 side,
-                price,
+                price_cents / 100,
                 quantity,
                 "LIMIT"
-            ])
+            )
+            out_idx += 1
         
         # Drift mid price slightly
         if i % 100 == 0:
-            mid_prices[symbol] += random.uniform(-0.5, 0.5)
+            mid_prices[symbol] += _uniform(-0.5, 0.5)
         
         # Advance time by 1-10 milliseconds
-        current_time += timedelta(milliseconds=random.randint(1, 10))
+        ts_ms += _randint(1, 10)
     
-    # Write to CSV
-    with open(output_file, 'w', newline='') as f:
-        writer = csv.writer(f)
-        writer.writerow(['timestamp', 'action', 'order_id', 'symbol', 
-                        'side', 'price', 'quantity', 'order_type'])
-        writer.writerows(orders)
+    del orders[out_idx:]
+    return orders, len(active_orders)
+
+
+_realistic_orders = _realistic_orders_jit if njit is not None else _realistic_orders_py
+
+
+def _generate_part(symbols, num_orders, start_ms, first_order_id, seed, part_file):
+    """Worker: write one symbol group's orders (no header) to part_file"""
+    orders, active_count = _realistic_orders(
+        symbols, num_orders, start_ms, first_order_id, seed)
+    
+    with open(part_file, 'w', newline='') as f:
+        csv.writer(f).writerows(orders)
+    
+    return len(orders), active_count
+
+
+def generate_realistic_orders(symbols, num_orders, output_file, jobs=None, seed=None):
+    """Generate realistic order flow CSV
+    
+    With more than one job, symbols are split into groups that are
+    simulated in parallel worker processes and the part files are
+    merged by timestamp into one time-ordered stream.
+    A fixed seed with the same job count reproduces the same orders on
+    any host, provided numba is either installed on both or on neither:
+    the compiled simulator draws a different stream from the pure-Python one.
+    """
+    
+    jobs = max(1, min(jobs or 1, len(symbols)))
+    
+    start_ms = int(datetime.now().timestamp() * 1000)
+    
+    # Per-worker seeds are drawn from one seeded generator; unseeded runs
+    # pass None so workers seed themselves
+    seeder = random.Random(seed) if seed is not None else None
+    
+    def part_seed():
+        return seeder.randrange(2**31) if seeder is not None else None
+    
+    if jobs == 1:
+        orders, active_count = _realistic_orders(
+            symbols, num_orders, start_ms, 1, part_seed())
+        
+        # Write to CSV
+        with open(output_file, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(CSV_HEADER)
+            writer.writerows(orders)
+        total = len(orders)
+    else:
+        from multiprocessing import Pool
+        
+        # Split symbols round-robin; each group gets its share of the
+        # orders and a disjoint order-id range so ids stay unique
+        per_symbol, extra = divmod(num_orders, len(symbols))
+        counts = [per_symbol + (i < extra) for i in range(len(symbols))]
+        tasks = []
+        first_order_id = 1
+        for g in range(jobs):
+            group, count = symbols[g::jobs], sum(counts[g::jobs])
+            tasks.append((group, count, start_ms, first_order_id,
+                          part_seed(), f"{output_file}.part{g}"))
+            first_order_id += count
+        
+        with Pool(jobs) as pool:
+            results = pool.starmap(_generate_part, tasks)
+        
+        # k-way merge on the timestamp column; each part is already in
+        # time order and ties keep part order
+        with open(output_file, 'w', newline='') as out, ExitStack() as stack:
+            csv.writer(out).writerow(CSV_HEADER)
+            parts = [stack.enter_context(open(task[-1], newline='')) for task in tasks]
+            out.writelines(heapq.merge(*parts, key=lambda line: line[:line.index(',')]))
+        for task in tasks:
+            os.remove(task[-1])
+        
+        total = sum(rows for rows, _ in results)
+        active_count = sum(active for _, active in results)
     
-    print(f"Generated {len(orders)} orders to {output_file}")
+    print(f"Generated {total} orders to {output_file}")
     print(f"Symbols: {', '.join(symbols)}")
-    print(f"Active orders at end: {len(active_orders)}")
+    print(f"Active orders at end: {active_count}")
 
 
 def generate_aggressive_cross(symbols, output_file):
     """Generate orders that will cross and generate trades"""
     
     orders = []
-    current_time = datetime.now()
+    ts_ms = int(datetime.now().timestamp() * 1000)
+    fmt = _timestamp_formatter()
     order_id = 1
     
     for symbol in symbols:
-        mid = 150.0
+        mid_cents = 15000
         
         # Post resting orders
         for i in range(5):
             # Buy side
             orders.append([
-                current_time.strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3],
+                fmt(ts_ms),
                 "NEW",
                 order_id,
                 symbol,
                 "BUY",
-                round(mid - (i + 1) * 0.01, 2),
+                (mid_cents - (i + 1)) / 100,
                 100 * (i + 1),
                 "LIMIT"
             ])
             order_id += 1
-            current_time += timedelta(milliseconds=1)
+            ts_ms += 1
             
             # Sell side
             orders.append([
-                current_time.strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3],
+                fmt(ts_ms),
                 "NEW",
                 order_id,
                 symbol,
                 "SELL",
-                round(mid + (i + 1) * 0.01, 2),
+                (mid_cents + (i + 1)) / 100,
                 100 * (i + 1),
                 "LIMIT"
             ])
             order_id += 1
-            current_time += timedelta(milliseconds=1)
+            ts_ms += 1
         
         # Send aggressive orders that cross
         orders.append([
-            current_time.strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3],
+            fmt(ts_ms),
             "NEW",
             order_id,
             symbol,
             "BUY",
-            round(mid + 0.03, 2),  # Cross 3 levels
+            (mid_cents + 3) / 100,  # Cross 3 levels
             250,
             "LIMIT"
         ])
         order_id += 1
-        current_time += timedelta(milliseconds=10)
+        ts_ms += 10
         
         orders.append([
-            current_time.strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3],
+            fmt(ts_ms),
             "NEW",
             order_id,
             symbol,
             "SELL",
-            round(mid - 0.03, 2),  # Cross 3 levels
+            (mid_cents - 3) / 100,  # Cross 3 levels
             250,
             "LIMIT"
         ])
         order_id += 1
-        current_time += timedelta(milliseconds=10)
+        ts_ms += 10
     
     with open(output_file, 'w', newline='') as f:
         writer = csv.writer(f)
-        writer.writerow(['timestamp', 'action', 'order_id', 'symbol', 
-                        'side', 'price', 'quantity', 'order_type'])
+        writer.writerow(CSV_HEADER)
         writer.writerows(orders)
     
     print(f"Generated aggressive crossing orders to {output_file}")
@@ -203,6 +444,13 @@ def main():
     parser.add_argument('--type', choices=['realistic', 'aggressive'], 
                        default='realistic',
                        help='Type of data to generate')
+    parser.add_argument('--jobs', type=int, default=None,
+                       help='Worker processes for realistic data, for large '
+                            '--count (default: 1)')
+    parser.add_argument('--seed', type=int, default=None,
+                       help='RNG seed for reproducible order flow with the same --jobs; '
+                            'installing numba changes the stream '
+                            '(timestamps still start at the current time)')
     
     args = parser.parse_args()
     
@@ -211,7 +459,7 @@ def main():
     print(f"Generating {args.type} market data...")
     
     if args.type == 'realistic':
-        generate_realistic_orders(symbols, args.count, args.output)
+        generate_realistic_orders(symbols, args.count, args.output, args.jobs, args.seed)
     else:
         generate_aggressive_cross(symbols, args.output)
     